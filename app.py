@@ -1,7 +1,15 @@
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from math import isnan
+from pathlib import Path
+from types import SimpleNamespace
+from zoneinfo import ZoneInfo
+
 import streamlit as st
-import yfinance as yf
 import pandas as pd
-import plotly.graph_objects as go
+import numpy as np
 
 # =========================
 # 1. 頁面配置
@@ -15,20 +23,198 @@ st.set_page_config(
 # =========================
 # 2. 數據引擎
 # =========================
-@st.cache_data(ttl=3600)
-def fetch_stock_data(sid: str):
+CACHE_DIR = Path(__file__).parent / ".cache" / "yf"
+TW_TZ = ZoneInfo("Asia/Taipei")
+MARKET_OPEN_HOUR = 9  # 09:00 開盤，之後當日 K 棒隨成交變動
+DATA_READY_HOUR = 14  # 13:30 收盤，14:00 後當日 K 棒才算定案
+CACHE_TTL = 3600  # 盤中行情最多沿用的秒數 (記憶體與硬碟快取共用)
+MA_WARMUP = 36  # 37MA 需要前 36 根 K 棒暖機
+# 各抓取區間：(yfinance period, 月數, 保守可得的交易日數，已扣除長假)
+PERIODS = [("6mo", 6, 110), ("1y", 12, 235), ("2y", 24, 475)]
+OVERLAP_BARS = 5  # 增量更新時重抓的尾端 K 棒數，用來偵測除權息還原
+MAX_STALE_DAYS = 30  # 快取太舊就整段重抓，不做增量
+OHLCV = ["Open", "High", "Low", "Close", "Volume"]  # 快取只存用得到的欄位
+SID_PATTERN = re.compile(r"[0-9A-Z]+")  # 代碼會進快取檔名，只收英數 (例如 00980A)
+
+def _trading_day(ts: datetime):
+    # 14:00 前仍屬前一個交易日，週末回推到週五
+    day = (ts.astimezone(TW_TZ) - timedelta(hours=DATA_READY_HOUR)).date()
+    while day.weekday() >= 5:
+        day -= timedelta(days=1)
+    return day
+
+def _in_session(ts: datetime):
+    # 平日開盤到定案前，最後一根 K 棒還會變
+    local = ts.astimezone(TW_TZ)
+    return local.weekday() < 5 and MARKET_OPEN_HOUR <= local.hour < DATA_READY_HOUR
+
+@st.cache_resource(max_entries=32)
+def _ticker(target: str):
+    # yfinance 載入很重，等第一次真的要抓資料才 import，側邊欄可先畫出來
+    import yfinance as yf
+
+    # yfinance 內建共用連線 session；只開啟其暫時性網路錯誤重試
+    yf.config.network.retries = 2
+    # Ticker 物件跨重跑共用 (內含時區等中繼資料)，唯讀使用
+    return yf.Ticker(target)
+
+def period_for(bars: int):
+    # 依回看天數 + 暖機挑最短的抓取區間，少抓少解析
+    for period, _, capacity in PERIODS:
+        if bars <= capacity:
+            return period
+    return PERIODS[-1][0]
+
+def _cache_path(target: str, period: str):
+    return CACHE_DIR / f"{target}_{period}.parquet"
+
+def load_cached_history(target: str, period: str):
+    # 硬碟快取：回傳 (df, 是否仍可直接沿用)；重啟或換使用者都先看這裡
+    path = _cache_path(target, period)
+    if not path.exists():
+        return None, False
+    try:
+        df = pd.read_parquet(path)
+    except Exception:
+        return None, False
+    now = datetime.now(TW_TZ)
+    mtime = datetime.fromtimestamp(path.stat().st_mtime, TW_TZ)
+    if (now - mtime).total_seconds() < CACHE_TTL:
+        return df, True
+    # 盤外寫入且現在也在盤外、同一交易日：K 棒已定案，整段沿用到下次開盤
+    # 盤中寫入或現在已開盤：只撐 CACHE_TTL，之後走增量更新補尾端
+    settled = not _in_session(mtime) and not _in_session(now)
+    return df, settled and _trading_day(mtime) == _trading_day(now)
+
+def _write_cache(target: str, period: str, df):
+    path = _cache_path(target, period)
+    tmp = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        df.to_parquet(tmp)
+        tmp.replace(path)
+    except Exception:
+        # 寫一半失敗時清掉暫存檔，不在快取目錄留垃圾；快取寫不進去不影響本次顯示
+        try:
+            tmp.unlink(missing_ok=True)
+        except OSError:
+            pass
+
+def download_history(ticker, period: str):
+    # 只取 OHLCV，不解析除權息/分割欄位
+    df = ticker.history(period=period, actions=False)
+    if not df.empty:
+        df = df[OHLCV]
+        _write_cache(ticker.ticker, period, df)
+    return df
+
+def update_history(ticker, period: str, cached):
+    # 增量更新：只抓快取尾端幾根之後的 K 棒，再接回舊資料
+    now = pd.Timestamp.now(tz=TW_TZ)
+    if len(cached) <= OVERLAP_BARS or (now - cached.index[-1]).days > MAX_STALE_DAYS:
+        return download_history(ticker, period)
+    start = cached.index[-OVERLAP_BARS]
+    fresh = ticker.history(start=start.strftime("%Y-%m-%d"), actions=False)
+    if fresh.empty:
+        return download_history(ticker, period)
+    # 重疊區 (不含最後一根，可能是盤中未定案) 價格若變了，代表除權息還原過，整段重抓
+    overlap = cached.index[-OVERLAP_BARS:-1].intersection(fresh.index)
+    if overlap.empty or not np.allclose(
+        cached.loc[overlap, "Close"], fresh.loc[overlap, "Close"], rtol=1e-4
+    ):
+        return download_history(ticker, period)
+    months = next(m for p, m, _ in PERIODS if p == period)
+    df = pd.concat([cached.loc[cached.index < fresh.index[0], OHLCV], fresh[OHLCV]])
+    df = df[df.index >= now - pd.DateOffset(months=months)]
+    _write_cache(ticker.ticker, period, df)
+    return df
+
+# 每組 (代碼, 區間) 一份；設上限避免大量查詢把記憶體吃滿
+@st.cache_data(ttl=CACHE_TTL, max_entries=64)
+def fetch_stock_data(sid: str, period: str):
     sid = sid.strip().upper()
-    for suffix in [".TW", ".TWO"]:
+    # 不合格式的輸入不碰硬碟也不打 Yahoo，直接當作找不到
+    if not SID_PATTERN.fullmatch(sid):
+        return pd.DataFrame(), None
+    suffixes = [".TW", ".TWO"]
+    # 先看硬碟：已知是哪個市場就不必再對另一個後綴發請求，過期則只補新 K 棒
+    for suffix in suffixes:
+        target = f"{sid}{suffix}"
+        cached, fresh = load_cached_history(target, period)
+        if cached is None:
+            continue
+        if fresh:
+            return cached, target
         try:
-            target = f"{sid}{suffix}"
-            ticker = yf.Ticker(target)
-            df = ticker.history(period="2y")
+            df = update_history(_ticker(target), period, cached)
             if not df.empty:
                 return df, target
         except Exception:
-            continue
+            pass
+        break
+    # 上市/上櫃同時查，誰先回來有資料就用誰，不必等 .TW 失敗再試 .TWO
+    executor = ThreadPoolExecutor(max_workers=len(suffixes))
+    try:
+        futures = {
+            executor.submit(download_history, _ticker(f"{sid}{suffix}"), period): f"{sid}{suffix}"
+            for suffix in suffixes
+        }
+        for future in as_completed(futures):
+            try:
+                df = future.result()
+            except Exception:
+                continue
+            if not df.empty:
+                return df, futures[future]
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
     return pd.DataFrame(), None
 
+def _prefix_sums(a):
+    # 前綴和與有效筆數，同一條序列的所有視窗共用這一次掃描
+    a = np.asarray(a, dtype=np.float64)
+    valid = ~np.isnan(a)
+    running_sum = np.concatenate(([0.0], np.cumsum(np.where(valid, a, 0.0))))
+    nobs = np.concatenate(([0], np.cumsum(valid, dtype=np.int64)))
+    return running_sum, nobs
+
+def _window_mean(prefix, w: int):
+    running_sum, nobs = prefix
+    out = np.full(running_sum.size - 1, np.nan)
+    if w <= 0 or out.size < w:
+        return out
+    win_sum = running_sum[w:] - running_sum[:-w]
+    win_n = nobs[w:] - nobs[:-w]
+    # 視窗內含缺值時比照 pandas rolling 回傳 NaN
+    out[w - 1:] = np.where(win_n == w, win_sum / w, np.nan)
+    return out
+
+def compute_all_mas(close):
+    # 收盤價只掃一次，MA5 / MA37 共用同一組前綴和
+    close_prefix = _prefix_sums(close)
+    return _window_mean(close_prefix, 5), _window_mean(close_prefix, 37)
+
+@st.cache_data(ttl=3600, max_entries=32)
+def compute_indicators(data_key: tuple, _close, _volume):
+    # 指標只跟行情有關，以 data_key 快取；調整成本、股數的重跑不必重算
+    ma5, ma37 = compute_all_mas(_close)
+    curr_p = float(_close[-1])
+    m37 = float(ma37[-1])
+    vol_today = float(_volume[-1])
+    # 量比只需要最近 5 日均量，直接取尾端平均，不必算整條 Vol_MA5
+    vol_ma5 = float(_volume[-5:].mean()) if _volume.size >= 5 else float("nan")
+    return {
+        "ma5": ma5,
+        "ma37": ma37,
+        "m37": m37,
+        # 生命線是否成形，算指標時判定一次，之後的分支直接看這個旗標
+        "ma_ready": not isnan(m37),
+        "vol_today": vol_today,
+        "vol_ratio": vol_today / vol_ma5 if vol_ma5 > 0 else 1.0,
+        "slope_37": float(ma37[-1] - ma37[-2]) if ma37.size >= 2 else float("nan"),
+        "bias_37": ((curr_p / m37) - 1) * 100 if m37 > 0 else 0,
+    }
+
 # =========================
 # 3. 側邊欄設定
 # =========================
@@ -36,27 +222,35 @@ st.sidebar.header("💰 實戰持倉設定")
 stock_id = st.sidebar.text_input("輸入代碼 (例如: 5498, 00980A)", value="5498").strip()
 cost_price = st.sidebar.number_input("買入均價", min_value=0.0, step=0.1, format="%.2f")
 shares = st.sidebar.number_input("持有股數", min_value=0, step=1000)
+# K 線只畫最近 N 根；抓取區間依此決定，診斷只需 37 根，預設近半年即可
+lookback = st.sidebar.slider("回看天數", min_value=60, max_value=420, value=60, step=20)
 
 # =========================
 # 4. 加載與計算
 # =========================
-df, final_id = fetch_stock_data(stock_id)
+df, final_id = fetch_stock_data(stock_id, period_for(lookback + MA_WARMUP))
 
 if df.empty:
     st.error(f"❌ 找不到 {stock_id}。請確認代碼正確或檢查網路。")
     st.stop()
 
 # 核心指標計算
-df["MA5"] = df["Close"].rolling(5).mean()
-df["MA37"] = df["Close"].rolling(37).mean()
-df["Vol_MA5"] = df["Volume"].rolling(5).mean()
+close_np = df["Close"].to_numpy()
+volume_np = df["Volume"].to_numpy()
+curr_p = float(close_np[-1])
+# 同一份行情的識別：代碼、筆數、最後一根 K 棒與其收盤 (盤中收盤會變)
+data_key = (final_id, len(df), str(df.index[-1]), curr_p)
+ind = compute_indicators(data_key, close_np, volume_np)
+# 均線只給圖表用，保留為陣列直接傳入，不掛回 df
+ma5, ma37 = ind["ma5"], ind["ma37"]
 
 # 最新數據
-curr_p = float(df["Close"].iloc[-1])
-m37 = float(df["MA37"].iloc[-1])
-vol_ratio = float(df["Volume"].iloc[-1] / df["Vol_MA5"].iloc[-1]) if df["Vol_MA5"].iloc[-1] > 0 else 1.0
-slope_37 = float(df["MA37"].diff().iloc[-1])
-bias_37 = ((curr_p / m37) - 1) * 100 if m37 > 0 else 0
+m37 = ind["m37"]
+ma_ready = ind["ma_ready"]
+vol_today = ind["vol_today"]
+vol_ratio = ind["vol_ratio"]
+slope_37 = ind["slope_37"]
+bias_37 = ind["bias_37"]
 
 # =========================
 # 5. 數據看板
@@ -72,73 +266,137 @@ if cost_price > 0 and shares > 0:
     pnl_pct = (curr_p / cost_price - 1) * 100
     c2.metric("真實損益", f"${pnl:,.0f}", f"{pnl_pct:+.2f}%")
 else:
-    c2.metric("成交量", f"{df['Volume'].iloc[-1]:,.0f}")
+    c2.metric("成交量", f"{vol_today:,.0f}")
 
-c3.metric("37MA 生命線", f"{m37:.2f}" if not pd.isna(m37) else "計算中")
+c3.metric("37MA 生命線", f"{m37:.2f}" if ma_ready else "計算中")
 
 # =========================
 # 6. K 線圖
 # =========================
-fig = go.Figure()
-fig.add_trace(go.Candlestick(
-    x=df.index, open=df["Open"], high=df["High"], 
-    low=df["Low"], close=df["Close"], name="K線"
-))
-fig.update_traces(increasing_line_color='#bc4749', increasing_fillcolor='#bc4749',
-                  decreasing_line_color='#6a994e', decreasing_fillcolor='#6a994e')
-fig.add_trace(go.Scatter(x=df.index, y=df["MA5"], name="5MA", line=dict(color='#a8dadc', width=1.2)))
-fig.add_trace(go.Scatter(x=df.index, y=df["MA37"], name="37MA", line=dict(color='#9b5de5', width=2)))
-fig.update_layout(height=400, template="plotly_dark", xaxis_rangeslider_visible=False, margin=dict(l=10, r=10, t=10, b=10))
-st.plotly_chart(fig, use_container_width=True)
+@st.cache_resource
+def _plotly_json_engine():
+    import plotly.io as pio
+
+    # st.plotly_chart 每次重跑都要把圖轉成 JSON，改用 C 實作的 orjson 編碼 (行程內全域設定，設一次即可)
+    pio.json.config.default_engine = "orjson"
+
+@st.cache_resource(max_entries=32)
+def build_chart(data_key: tuple, lookback: int, _df, _ma5, _ma37):
+    import plotly.graph_objects as go
+
+    # 圖只跟行情有關；調整成本、股數的重跑直接沿用同一張圖
+    # 圖表只需顯示精度，轉 float32 讓送往瀏覽器的陣列減半；指標與損益仍用 float64
+    ohlc32 = _df[["Open", "High", "Low", "Close"]].to_numpy(dtype=np.float32)
+    # 去掉時區但保留台北當地時間，避免 datetime64 被換成 UTC 而錯位一天
+    dates = _df.index.tz_localize(None)
+    x = dates.to_numpy()
+    # 週末與休市日沒有 K 棒，直接從時間軸拿掉；休市日由資料缺口推得，不必維護假日表
+    closed_days = pd.bdate_range(dates[0], dates[-1]).difference(dates.normalize())
+    final_id = data_key[0]
+    return go.Figure(
+        data=[
+            go.Candlestick(
+                x=x, open=ohlc32[:, 0], high=ohlc32[:, 1],
+                low=ohlc32[:, 2], close=ohlc32[:, 3], name="K線",
+                increasing_line_color='#bc4749', increasing_fillcolor='#bc4749',
+                decreasing_line_color='#6a994e', decreasing_fillcolor='#6a994e'
+            ),
+            go.Scatter(x=x, y=_ma5.astype(np.float32), name="5MA", line=dict(color='#a8dadc', width=1.2)),
+            go.Scatter(x=x, y=_ma37.astype(np.float32), name="37MA", line=dict(color='#9b5de5', width=2)),
+        ],
+        layout=go.Layout(
+            height=400, template="plotly_dark", xaxis_rangeslider_visible=False, margin=dict(l=10, r=10, t=10, b=10),
+            # 明示日期軸省去型別推斷；同一檔股票重跑時保留使用者的縮放狀態
+            xaxis_type="date", uirevision=final_id,
+            xaxis_rangebreaks=[
+                dict(bounds=["sat", "mon"]),
+                dict(values=closed_days.strftime("%Y-%m-%d").tolist()),
+            ]
+        )
+    )
+
+_plotly_json_engine()
+# 指標用完整資料暖機，圖只送最近 lookback 根，MA37 從第一根就有值
+st.plotly_chart(
+    build_chart(data_key, lookback, df.tail(lookback), ma5[-lookback:], ma37[-lookback:]),
+    use_container_width=True
+)
 
 # =========================
 # 7. 垂直診斷報告 (含乖離率影響判讀)
 # =========================
+@st.cache_resource
+def _ui_constants():
+    # 文案查表是純常數；腳本每次重跑都會整段重新執行，放進 cache_resource 整個行程只建一次
+    # 判定結論顏色與標題 (Streamlit 內建色名)
+    regimes = {
+        "bull": ("green", "多頭結構：順風局", "價格穩站在生命線上，目前處於健康的上升軌道。"),
+        "bear": ("red", "趨勢轉弱：逆風局", "跌破生命線，代表空頭掌握主導權，不宜硬碰硬。"),
+        "flat": ("orange", "區間震盪：磨人局", "方向不明，股價在生命線附近徘徊，靜待表態。"),
+        "unknown": ("gray", "資料不足：觀察期", "交易日數還不到 37 天，生命線尚未成形，先觀察不急著下結論。"),
+    }
+
+    retreat = ("error", "**「有人在撤退，別當最後一個。」**\n\n帶量跌破生命線是危險訊號。大戶撤離時，這條線會從支撐變壓力。先保護本金，不要盲目談信仰。")
+    boiling = ("error", "**「溫水煮青蛙，耐心被磨平。」**\n\n雖然賣壓不重，但站不回生命線代表買盤極度虛弱。建議保持觀望，等股價重新站回 37MA 才是重生契機。")
+    strategy = {
+        (True, "hot"): ("success", "**「油門踩很深，動能充沛！」**\n\n量價齊揚，這波動能是真的。持股者可上移停利防線續抱；若乖離率沒過熱，則是強勢標的。"),
+        (True, "dry"): ("warning", "**「位階不錯，但沒人理。」**\n\n雖然股價在上面，但成交量縮得太厲害。這就像車子空有外殼但沒汽油，小心出現「假突破」後的虛弱回測。"),
+        (True, "normal"): ("success", "**「節奏穩健，順勢而為。」**\n\n目前處於常態推升，沒有異常爆量或萎縮。順著生命線斜率慢慢抱著就好。"),
+        (False, "hot"): retreat,
+        (False, "dry"): boiling,
+        (False, "normal"): boiling,
+    }
+
+    # 乖離率文案模板 (綁定好的 str.format，重跑時只填數字)
+    bias = {
+        "hot": "⚠️ **注意過熱風險**：目前的乖離率高達 `{bias_37:.2f}%`，代表股價離 37MA 太遠了，這就像皮球彈得太高，**隨時可能引發獲利了結的賣壓回測**。建議不要在此加碼。".format,
+        "deep": "📉 **注意跌深反彈**：乖離率來到 `{bias_37:.2f}%`，股價嚴重低於 37MA，**技術性反彈的機會正在增加**。雖然還沒轉強，但這時殺低通常不是明智之舉。".format,
+        "normal": "✅ **乖離適中**：目前乖離率為 `{bias_37:.2f}%`，股價與平均成本距離合理，**走勢較為紮實，沒有過熱或超跌的極端現象。**".format,
+    }
+
+    # 生命線未成形時的中性提示 (取代乖離與量能指引)
+    pending = "⏳ **生命線尚未成形**：交易日數不足 37 天，乖離率與量能指引暫不提供，待 37MA 算出後再判讀。"
+
+    return SimpleNamespace(REGIMES=regimes, STRATEGY=strategy, BIAS=bias, PENDING=pending)
+
+C = _ui_constants()
+
 st.markdown("---")
 st.subheader("📋 趨勢結構診斷")
 
-# 判定結論背景與標題
-if curr_p > m37 and slope_37 > 0:
-    bg_color, title, text = "#2d4a3e", "多頭結構：順風局", "價格穩站在生命線上，目前處於健康的上升軌道。"
-elif curr_p < m37:
-    bg_color, title, text = "#5d2e2e", "趨勢轉弱：逆風局", "跌破生命線，代表空頭掌握主導權，不宜硬碰硬。"
-else:
-    bg_color, title, text = "#5f4b32", "區間震盪：磨人局", "方向不明，股價在生命線附近徘徊，靜待表態。"
+def classify(ma_ready: bool, curr_p: float, m37: float, slope_37: float):
+    if not ma_ready:
+        return "unknown"
+    if curr_p > m37 and slope_37 > 0:
+        return "bull"
+    if curr_p < m37:
+        return "bear"
+    return "flat"
 
-st.markdown(f"""
-    <div style="background-color:{bg_color}; padding:20px; border-radius:12px; border-left: 10px solid rgba(255,255,255,0.15); margin-bottom:20px;">
-        <h3 style="color:white; margin:0; font-size:20px; font-weight:bold;">{title}</h3>
-        <p style="color:rgba(255,255,255,0.85); margin:10px 0 0 0; font-size:15px; line-height:1.5;">{text}</p>
-    </div>
-""", unsafe_allow_html=True)
+color, title, text = C.REGIMES[classify(ma_ready, curr_p, m37, slope_37)]
+
+# 原生外框容器，免去自訂 HTML 的消毒與解析
+with st.container(border=True):
+    st.markdown(f"#### :{color}[{title}]")
+    st.write(text)
 
 # 🚩 戰略指引 (將乖離率與量能結合)
 st.markdown("#### 🚩 AI 戰略戰情室")
 
-# 1. 針對乖離率的影響進行分析
-bias_analysis = ""
-if bias_37 > 10:
-    bias_analysis = f"⚠️ **注意過熱風險**：目前的乖離率高達 `{bias_37:.2f}%`，代表股價離 37MA 太遠了，這就像皮球彈得太高，**隨時可能引發獲利了結的賣壓回測**。建議不要在此加碼。"
-elif bias_37 < -10:
-    bias_analysis = f"📉 **注意跌深反彈**：乖離率來到 `{bias_37:.2f}%`，股價嚴重低於 37MA，**技術性反彈的機會正在增加**。雖然還沒轉強，但這時殺低通常不是明智之舉。"
-else:
-    bias_analysis = f"✅ **乖離適中**：目前乖離率為 `{bias_37:.2f}%`，股價與平均成本距離合理，**走勢較為紮實，沒有過熱或超跌的極端現象。**"
-
-st.info(bias_analysis)
-
-# 2. 綜合量能與位階的實戰指引
-if curr_p > m37:
-    if vol_ratio >= 1.3:
-        st.success("**「油門踩很深，動能充沛！」**\n\n量價齊揚，這波動能是真的。持股者可上移停利防線續抱；若乖離率沒過熱，則是強勢標的。")
-    elif vol_ratio < 0.8:
-        st.warning("**「位階不錯，但沒人理。」**\n\n雖然股價在上面，但成交量縮得太厲害。這就像車子空有外殼但沒汽油，小心出現「假突破」後的虛弱回測。")
-    else:
-        st.success("**「節奏穩健，順勢而為。」**\n\n目前處於常態推升，沒有異常爆量或萎縮。順著生命線斜率慢慢抱著就好。")
+if not ma_ready:
+    # 生命線尚未成形：乖離率與站上/跌破都無從判斷，只給中性提示，與上方「觀察期」一致
+    st.info(C.PENDING)
 else:
-    if vol_ratio >= 1.3:
-        st.error("**「有人在撤退，別當最後一個。」**\n\n帶量跌破生命線是危險訊號。大戶撤離時，這條線會從支撐變壓力。先保護本金，不要盲目談信仰。")
-    else:
-        st.error("**「溫水煮青蛙，耐心被磨平。」**\n\n雖然賣壓不重，但站不回生命線代表買盤極度虛弱。建議保持觀望，等股價重新站回 37MA 才是重生契機。")
+    # 1. 針對乖離率的影響進行分析：文案模板預先建好，這裡只挑一個填數字
+    bias_state = "hot" if bias_37 > 10 else "deep" if bias_37 < -10 else "normal"
+    bias_analysis = C.BIAS[bias_state](bias_37=bias_37)
+
+    st.info(bias_analysis)
+
+    # 2. 綜合量能與位階的實戰指引：(站上生命線?, 量能狀態) 查表一次決定
+    vol_state = "hot" if vol_ratio >= 1.3 else "dry" if vol_ratio < 0.8 else "normal"
+    kind, advice = C.STRATEGY[(curr_p > m37, vol_state)]
+    getattr(st, kind)(advice)
 
 st.divider()
 st.caption("🔍 註：診斷結合價格位階與量能。技術指標具滯後性，請務必獨立判斷。")